@@ -30,19 +30,51 @@ import os
 import json
 import re
 import math
+import sys
 from collections import defaultdict, OrderedDict
+from functools import lru_cache
+from itertools import chain, islice
+from datetime import datetime
 from dateutil.parser import parse as parse_date, ParserError
-from decimal import Decimal, InvalidOperation
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
+# Inputs at or above this size are streamed row by row instead of being
+# materialized in memory all at once.
+_STREAM_THRESHOLD = 256 << 20
+
+# Precompiled patterns; re's internal cache is small and the per-call lookup
+# is pure overhead in the per-value hot loops below.
+# One pass through the regex VM classifies int/float/bool strings; branching
+# happens on which named group matched.  Case-insensitivity only affects the
+# bool words since the numeric branches contain no letters.
+_CLASSIFY_RE = re.compile(
+    r"(?P<int>[+-]?\d+)"
+    r"|(?P<flt>[+-]?(?:\d+\.\d*|\.\d+))"
+    r"|(?P<bool>true|false|yes|no)",
+    re.IGNORECASE,
+)
+_DATE_HINT_RE = re.compile(r"\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{4}")
+_TRAIL_DIGITS_RE = re.compile(r"\d+$")
+_PASCAL_SPLIT_RE = re.compile(r"[^0-9a-zA-Z]+")
+_PASCAL_TOKEN_RE = re.compile(r"[A-Z]{2,}(?=[A-Z][a-z]|[0-9]|$)|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+@lru_cache(maxsize=None)
 def to_pascal(s):
-    words = re.split(r"[^0-9a-zA-Z]+", s)
+    words = _PASCAL_SPLIT_RE.split(s)
     tokens = []
-    pattern = r"[A-Z]{2,}(?=[A-Z][a-z]|[0-9]|$)|[A-Z]?[a-z]+|[A-Z]+|[0-9]+"
     for w in words:
         if not w:
             continue
-        for t in re.findall(pattern, w):
+        for t in _PASCAL_TOKEN_RE.findall(w):
             tokens.append(t)
     def cap_part(p):
         if len(p) == 2:
@@ -51,88 +83,144 @@ def to_pascal(s):
     return "".join(cap_part(part) for part in tokens)
 
 
-def infer_sql_type(values, nerd=False, cushion_arg="10%"):
-    has_int = has_float = has_date = has_datetime = has_str = has_bool = False
-    min_len = None
-    max_len = max_prec = max_scale = 0
-    for v in values:
-        if isinstance(v, bool):
-            has_bool = True
-            continue
-        if isinstance(v, int):
-            has_int = True
-            continue
-        if isinstance(v, float):
-            has_float = True
-            try:
-                d = Decimal(str(v))
-                prec = len(d.as_tuple().digits)
-                scale = max(-d.as_tuple().exponent, 0)
-                max_prec = max(max_prec, prec)
-                max_scale = max(max_scale, scale)
-            except InvalidOperation:
-                pass
-            continue
-        if isinstance(v, str):
-            s = v.strip()
-            length = len(s)
-            if not s or length == 0:
-                continue
+def _strip_fast(s):
+    """s.strip(), minus the unconditional copy when nothing needs stripping
+    (the common case for exported data)."""
+    if s and not s[0].isspace() and not s[-1].isspace():
+        return s
+    return s.strip()
 
-            if re.fullmatch(r"[+-]?\d+", s):
-                has_int = True
-                continue
 
-            if re.fullmatch(r"[+-]?(?:\d+\.\d*|\.\d+)", s):
-                has_float = True
-                try:
-                    d = Decimal(s)
-                    prec = len(d.as_tuple().digits)
-                    scale = max(-d.as_tuple().exponent, 0)
-                    max_prec = max(max_prec, prec)
-                    max_scale = max(max_scale, scale)
-                except InvalidOperation:
-                    pass
-                continue
+# Components the input leaves unspecified are filled from this sentinel, so
+# a result still carrying 00:00:01 means the string had no time component.
+_DATE_SENTINEL = datetime(1, 1, 1, 0, 0, 1)
 
-            if s.lower() in ("true", "false", "yes", "no"):
-                has_bool = True
-                continue
 
-            try:
-                _ = parse_date(s, fuzzy=False)
-                if re.search(r"\d{1,2}:\d{2}(:\d{2})?", s):
-                    has_datetime = True
+@lru_cache(maxsize=4096)
+def _try_parse_date(s):
+    """parse_date, memoized; returns None instead of raising on non-dates."""
+    try:
+        return parse_date(s, default=_DATE_SENTINEL, fuzzy=False)
+    except (ParserError, ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _prec_scale_from_str(s):
+    """Precision/scale of a decimal literal, without building a Decimal.
+
+    Memoized: transactional JSON repeats numeric values (prices, statuses)
+    heavily, so most calls become a dict hit."""
+    if s[0] in "+-":
+        s = s[1:]
+    mantissa, sep, exp = s.partition("e")
+    int_part, _, frac_part = mantissa.partition(".")
+    scale = len(frac_part)
+    if sep:
+        scale = max(scale - int(exp), 0)
+    digits = (int_part + frac_part).lstrip("0") or "0"
+    return len(digits), scale
+
+
+# Observed-type flags, packed into one int so the final type decision is a
+# plain integer compare instead of building lists for any().
+FLAG_INT = 1
+FLAG_FLOAT = 2
+FLAG_DATE = 4
+FLAG_DATETIME = 8
+FLAG_STR = 16
+FLAG_BOOL = 32
+
+
+class ColStats:
+    """Running per-column aggregates, folded one value at a time so the
+    values themselves never have to be retained."""
+
+    __slots__ = ("flags", "max_len", "min_len", "max_prec", "max_scale", "nonnull")
+
+    def __init__(self):
+        self.flags = 0
+        self.max_len = self.max_prec = self.max_scale = 0
+        self.min_len = None
+        self.nonnull = 0
+
+
+def _update_stats(st, v):
+    st.nonnull += 1
+    # json only ever yields bool/int/float/str here, so dispatch on the
+    # exact type; isinstance's subclass walk is wasted work per value.
+    t = type(v)
+    if t is bool:
+        st.flags |= FLAG_BOOL
+        return
+    if t is int:
+        st.flags |= FLAG_INT
+        return
+    if t is float:
+        st.flags |= FLAG_FLOAT
+        prec, scale = _prec_scale_from_str(repr(v))
+        if prec > st.max_prec:
+            st.max_prec = prec
+        if scale > st.max_scale:
+            st.max_scale = scale
+        return
+    if t is str:
+        # process_table strips strings before folding them in
+        s = v
+        length = len(s)
+        if not s:
+            return
+
+        m = _CLASSIFY_RE.fullmatch(s)
+        if m is not None:
+            g = m.lastgroup
+            if g == "int":
+                st.flags |= FLAG_INT
+            elif g == "flt":
+                st.flags |= FLAG_FLOAT
+                prec, scale = _prec_scale_from_str(s)
+                if prec > st.max_prec:
+                    st.max_prec = prec
+                if scale > st.max_scale:
+                    st.max_scale = scale
+            else:
+                st.flags |= FLAG_BOOL
+            return
+
+        # Cheap pre-filter: only strings that look at all date-like are
+        # worth handing to dateutil's (expensive) generic parser.
+        if _DATE_HINT_RE.search(s):
+            dt = _try_parse_date(s)
+            if dt is not None:
+                if dt.hour == 0 and dt.minute == 0 and dt.second == 1:
+                    st.flags |= FLAG_DATE
                 else:
-                    has_date = True
-                continue
-            except (ParserError, ValueError):
-                pass
-            except (OverflowError):
-                pass
-
-            has_str = True
-            max_len = max(max_len, length)
-            min_len = length if min_len is None else min(min_len, length)
-            continue
+                    st.flags |= FLAG_DATETIME
+                return
+    else:
+        s = str(v)
+        length = len(s)
+
+    st.flags |= FLAG_STR
+    if length > st.max_len:
+        st.max_len = length
+    if st.min_len is None or length < st.min_len:
+        st.min_len = length
+
 
-        txt = str(v)
-        has_str = True
-        length = len(txt)
-        max_len = max(max_len, length)
-        min_len = length if min_len is None else min(min_len, length)
-    if has_datetime and not any([has_str,has_float,has_int,has_date,has_bool]):
+def infer_sql_type(st, nerd=False, cushion_arg="10%"):
+    flags = st.flags
+    if flags == FLAG_DATETIME:
         return "DATETIME"
-    if has_date and not any([has_str,has_float,has_int,has_datetime,has_bool]):
+    if flags == FLAG_DATE:
         return "DATE"
-    if has_bool and not any([has_str,has_float,has_int,has_date,has_datetime]):
+    if flags == FLAG_BOOL:
         return "BOOLEAN"
-    if has_float:
-        precision = max(1, max_prec)
-        scale = max_scale
-        return f"DECIMAL({precision},{scale})"
-    if has_int and not any([has_float,has_str,has_date,has_datetime,has_bool]):
+    if flags & FLAG_FLOAT:
+        return f"DECIMAL({max(1, st.max_prec)},{st.max_scale})"
+    if flags == FLAG_INT:
         return "INTEGER"
+    max_len, min_len = st.max_len, st.min_len
     orig = max(1, max_len)
     if nerd:
         if cushion_arg.endswith("%"):
@@ -158,6 +246,93 @@ def infer_sql_type(values, nerd=False, cushion_arg="10%"):
     return f"VARCHAR({length})"
 
 
+def _fold_list(v, rid, st, key, nested_objs, nested_prims):
+    """Route a non-empty list value: all-dict lists become object subtables,
+    all-primitive lists become value subtables, mixed lists stay scalar."""
+    if all(isinstance(x, dict) for x in v):
+        nested_objs[key].append((rid, v))
+    elif all(not isinstance(x, dict) for x in v):
+        nested_prims[key].append((rid, v))
+    else:
+        _update_stats(st, v)
+
+
+def _fold_row(row, rid, stats, nested_objs, nested_prims):
+    """Generic fold of one record into the per-column accumulators."""
+    for key, value in row.items():
+        if isinstance(value, str):
+            value = _strip_fast(value)
+            if not value:
+                continue
+        if value is None:
+            continue
+        if isinstance(value, list) and value:
+            _fold_list(value, rid, stats[key], key, nested_objs, nested_prims)
+            continue
+        _update_stats(stats[key], value)
+
+
+# How many leading rows to inspect before deciding a record shape is stable
+# enough to specialize for.
+_SPECIALIZE_PROBE = 32
+
+
+def _compile_row_folder(keys, stats, nested_objs, nested_prims):
+    """exec a row folder specialized to one record shape.
+
+    Field names are inlined as constants and each column's ColStats is bound
+    to its own global, so folding a row does no dict iteration and no stats
+    lookups; rows that do not match the probed shape fall back to the
+    generic _fold_row."""
+    g = {
+        "_update_stats": _update_stats,
+        "_strip_fast": _strip_fast,
+        "_fold_list": _fold_list,
+        "_fold_row": _fold_row,
+        "_stats": stats,
+        "_objs": nested_objs,
+        "_prims": nested_prims,
+        "_shape": frozenset(keys),
+    }
+    lines = [
+        "def _fold_rows(records):",
+        "    n = 0",
+        "    for row in records:",
+        "        n += 1",
+        "        rid = row.get('ID')",
+        "        if row.keys() != _shape:",
+        "            _fold_row(row, rid, _stats, _objs, _prims)",
+        "            continue",
+    ]
+    for i, k in enumerate(keys):
+        st = f"_st_{i}"
+        g[st] = stats[k]
+        lines += [
+            f"        v = row[{k!r}]",
+            "        t = v.__class__",
+            "        if t is str:",
+            "            v = _strip_fast(v)",
+            "            if v:",
+            f"                _update_stats({st}, v)",
+            "        elif t is list:",
+            "            if v:",
+            f"                _fold_list(v, rid, {st}, {k!r}, _objs, _prims)",
+            "            else:",
+            f"                _update_stats({st}, v)",
+            "        elif v is not None:",
+            f"            _update_stats({st}, v)",
+        ]
+    lines.append("    return n")
+    exec(compile("\n".join(lines), "<row-folder>", "exec"), g)
+    return g["_fold_rows"]
+
+
+def _q(s):
+    """Escape embedded quotes for a quoted identifier; almost no JSON key
+    contains one, so skip the allocation .replace always makes."""
+    return s.replace('"', '""') if '"' in s else s
+
+
 def _get_primary_key_type(col_defs):
     for d in col_defs:
         if '"id"' in d and "PRIMARY KEY" in d:
@@ -179,94 +354,100 @@ def process_table(
 ):
     if schemas is None:
         schemas = OrderedDict()
-    total_rows = len(records)
-    cols = defaultdict(list)
+    stats = defaultdict(ColStats)
     nested_objs = defaultdict(list)
     nested_prims = defaultdict(list)
-    for row in records:
-        for key, value in row.items():
-            if isinstance(value, str):
-                value = value.strip()
-                if not value:
-                    continue
-            if value is None:
-                continue
-            if isinstance(value, list) and value and all(isinstance(x, dict) for x in value):
-                nested_objs[key].extend(value)
-                continue
-            if isinstance(value, list) and value and all(not isinstance(x, dict) for x in value):
-                nested_prims[key].extend(value)
-                continue
-            cols[key].append(value)
+    # records may be a streaming iterator, so count rows as they go by;
+    # scalar values are folded straight into per-column aggregates instead
+    # of being buffered, keeping memory at O(columns) rather than O(values).
+    # Probe the leading rows: single-table exports have one stable key set,
+    # which lets us run a folder specialized to that shape.
+    records = iter(records)
+    probe = list(islice(records, _SPECIALIZE_PROBE))
+    if probe and all(r.keys() == probe[0].keys() for r in probe):
+        fold_rows = _compile_row_folder(
+            list(probe[0]), stats, nested_objs, nested_prims
+        )
+        total_rows = fold_rows(chain(probe, records))
+    else:
+        total_rows = 0
+        for row in chain(probe, records):
+            total_rows += 1
+            _fold_row(row, row.get("ID"), stats, nested_objs, nested_prims)
+    # The specialized folder pre-binds a ColStats per probed column; drop
+    # any that never saw a value so all-null columns stay out of the schema
+    stats = OrderedDict(
+        (c, st) for c, st in stats.items() if st.nonnull
+    )
     # Determine null status and grouping bases
-    null_status = {c: len(vals) < total_rows for c, vals in cols.items()}
+    not_null = {c: st.nonnull >= total_rows for c, st in stats.items()}
     groups = defaultdict(list)
-    for c in cols.keys():
-        base = re.sub(r"\d+$", "", c)
+    for c in stats.keys():
+        base = _TRAIL_DIGITS_RE.sub("", c)
         groups[base].append(c)
-    # Order groups: non-null first then null
-    def group_has_non_null(base):
-        return any(not null_status[c] for c in groups[base])
-    ordered_bases = sorted(
-        groups.keys(),
-        key=lambda b: (not group_has_non_null(b), b.lower())
-    )
+    # Order groups: non-null first then null.  Work out each base's facts
+    # once instead of re-walking its group per sort-key evaluation.
+    base_has_nn = {b: any(not_null[c] for c in cs) for b, cs in groups.items()}
+    ordered_bases = sorted(groups, key=lambda b: (not base_has_nn[b], b.lower()))
+    sorted_groups = {b: sorted(cs) for b, cs in groups.items()}
+    # Pick the output-name transform once; both branches are loop-invariant
+    if pascal and rename_map:
+        rename = lambda c: to_pascal(rename_map.get(c, c))
+    elif pascal:
+        rename = to_pascal
+    elif rename_map:
+        rename = lambda c: rename_map.get(c, c)
+    else:
+        rename = lambda c: c
     # Build definitions with PK first, FKs next
     pk_col = pk_source if pk_source else "ID"
     col_defs = []
     # Primary key
-    if pk_col in cols:
-        sql = infer_sql_type(cols[pk_col], nerd, cushion_arg)
-        out = pk_col if rename_map is None else rename_map.get(pk_col, pk_col)
-        if pascal:
-            out = to_pascal(out)
-        safe = out.replace('"', '""')
+    if pk_col in stats:
+        sql = infer_sql_type(stats[pk_col], nerd, cushion_arg)
+        safe = _q(rename(pk_col))
         col_defs.append(f"    \"{safe}\" {sql} PRIMARY KEY")
     # Foreign key
     if parent_fk:
         fk_name, fk_type = parent_fk
-        out = rename_map.get(fk_name, fk_name)
-        if pascal:
-            out = to_pascal(out)
-        safe = out.replace('"', '""')
+        safe = _q(rename(fk_name))
         col_defs.append(f"    \"{safe}\" {fk_type} NOT NULL")
-    # Other columns
+    # Other columns; keep a lookup by source column for insertion order
     other_defs = []
+    def_by_col = {}
     for base in ordered_bases:
-        for c in sorted(groups[base]):
+        for c in sorted_groups[base]:
             if c == pk_col or (parent_fk and c == parent_fk[0]):
                 continue
-            sql = infer_sql_type(cols[c], nerd, cushion_arg)
-            out = c if rename_map is None else rename_map.get(c, c)
-            if pascal:
-                out = to_pascal(out)
-            safe = out.replace('"', '""')
+            sql = infer_sql_type(stats[c], nerd, cushion_arg)
+            safe = _q(rename(c))
             d = f"    \"{safe}\" {sql}"
-            if not null_status[c]:
+            if not_null[c]:
                 d += " NOT NULL"
             other_defs.append(d)
+            def_by_col[c] = d
     # If sort flag, grouping applied; else preserve insertion order
     if sort:
         col_defs.extend(other_defs)
     else:
         # insertion order as encountered
-        for c in cols.keys():
-            if pascal:
-                c = to_pascal(c)
+        for c in stats:
             if c == pk_col or (parent_fk and c == parent_fk[0]):
                 continue
-            for d in other_defs:
-                if re.search(rf"\"{c}\"", d):
-                    col_defs.append(d)
-                    break
+            d = def_by_col.get(c)
+            if d:
+                col_defs.append(d)
     schemas[table_name] = col_defs
     # Recurse nested objects and primitives
-    for field, children in nested_objs.items():
+    for field, batches in nested_objs.items():
         sub_name = f"{table_name}_{field}"
         fk_col = f"{table_name}_id"
         fk_type = _get_primary_key_type(col_defs)
-        for child in children:
-            child[fk_col] = next((r.get("ID") for r in records if isinstance(r, dict)), None)
+        children = []
+        for rid, batch in batches:
+            for child in batch:
+                child[fk_col] = rid
+                children.append(child)
         process_table(
             children,
             sub_name,
@@ -279,14 +460,13 @@ def process_table(
             pk_source=pk_source,
             cushion_arg=cushion_arg
         )
-    for field, prims in nested_prims.items():
+    for field, batches in nested_prims.items():
         sub_name = f"{table_name}_{field}"
         fk_col = f"{table_name}_id"
         fk_type = _get_primary_key_type(col_defs)
-        prim_records = []
-        for row in records:
-            for v in row.get(field, []):
-                prim_records.append({fk_col: row.get("ID"), "value": v})
+        prim_records = [
+            {fk_col: rid, "value": v} for rid, vs in batches for v in vs
+        ]
         process_table(
             prim_records,
             sub_name,
@@ -302,12 +482,31 @@ def process_table(
     return schemas
 
 
-def render_ddl(schemas):
-    statements = []
+def load_records(path):
+    """Load the top-level JSON array, preferring orjson when installed and
+    streaming oversized files through ijson to keep peak memory bounded."""
+    if ijson is not None and os.path.getsize(path) >= _STREAM_THRESHOLD:
+        return ijson.items(open(path, "rb"), "item")
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if not isinstance(data, list):
+        raise ValueError("JSON top-level must be an array of objects.")
+    return data
+
+
+def render_ddl(schemas, out):
+    """Write CREATE TABLE statements to a file-like object, one at a time,
+    so the full DDL is never held in memory."""
+    first = True
     for table, defs in schemas.items():
-        stmt = f"CREATE TABLE {table} (\n" + ",\n".join(defs) + "\n);"
-        statements.append(stmt)
-    return "\n\n".join(statements)
+        if first:
+            first = False
+        else:
+            out.write("\n\n")
+        out.write(f"CREATE TABLE {table} (\n")
+        out.write(",\n".join(defs))
+        out.write("\n);")
 
 
 def main():
@@ -336,9 +535,7 @@ def main():
                 rename_map[src] = dst.replace("$table", table_name)
             else:
                 parser.error(f"Invalid map '{mapping}', expected src:dst")
-    data = json.load(open(args.input, encoding="utf-8"))
-    if not isinstance(data, list):
-        raise ValueError("JSON top-level must be an array of objects.")
+    data = load_records(args.input)
 
     schemas = process_table(
         data,
@@ -350,13 +547,13 @@ def main():
         pk_source=args.primary_key,
         cushion_arg=args.cushion
     )
-    ddl = render_ddl(schemas)
     if args.output:
         with open(args.output, 'w', encoding="utf-8") as f:
-            f.write(ddl)
+            render_ddl(schemas, f)
         print(f"Schema DDL written to {args.output}")
     else:
-        print(ddl)
+        render_ddl(schemas, sys.stdout)
+        sys.stdout.write("\n")
 
 if __name__ == "__main__":
     main()